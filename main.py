@@ -1,4 +1,11 @@
 import copy  #copies nested list to avoid mutating the consumed lists
+import os  #atomically replaces search checkpoints
+import sys  #exit status of the command line interface
+
+## gzip and json are only needed for checkpoints, OrderedDict and
+## tracemalloc only for the bounded search, argparse and time only for
+## the command line, so they are imported where they are used to keep
+## importing this module cheap.
 
 ## A Board, B, is a (listof (listof (anyof Str Nat Guess))
 ## Requires:
@@ -16,6 +23,11 @@ import copy  #copies nested list to avoid mutating the consumed lists
 ##   len(C[0]) == 1
 ##   C[1] > 0
 
+## A Key, K, is a (list Nat (tupleof (anyof Str Nat (tuple Str Nat))))
+##   as a tuple: the number of constraints left in a puzzle and the cells
+##   of its board row by row, with each Guess as a (symbol, number) tuple.
+##   (i.e. a hashable, unambiguous stand-in for a puzzle during a search)
+
 class Puzzle:
   '''
     Fields:
@@ -159,180 +171,48 @@ class Posn:
       self.y == other.y
 
 
-## ******** TESTING VALUES ***************
-## Note: These are also used in the examples below.
+class SearchStats:
+  '''
+  Fields:
+     explored (Nat)
+     max_depth (Nat)
+     cache_size (Nat)
+     evictions (Nat)
+     peak_memory (anyof Nat None)
+     Note: explored counts the puzzles whose neighbours were generated,
+       max_depth is the longest search path, cache_size the largest
+       number of dead ends cached at once and evictions the number
+       dropped from the cache. peak_memory is the peak number of bytes
+       allocated during the search, or None if it was not measured.
+  '''
 
-puzzle1 = Puzzle(4, [['a','b','b','c'],
-                     ['a','d','e','e'],
-                     ['f','d','g','g'],
-                     ['f','h','i','i']],
-                    [['a',6,'*'],
-                     ['b',3,'-'],
-                     ['c',3,'='],
-                     ['d',5,'+'],
-                     ['e',3,'-'],
-                     ['f',3,'-'],
-                     ['g',2,'/'],
-                     ['h',4,'='],
-                     ['i',1,'-']])
+  def __init__(self):
+    '''
+    Initializes a SearchStats with all counts at zero.
+
+    Effects: Mutates self
+
+    __init__: SearchStats -> None
+    '''
+    self.explored = 0
+    self.max_depth = 0
+    self.cache_size = 0
+    self.evictions = 0
+    self.peak_memory = None
 
-puzzle1partial = Puzzle(4, [['a','b','b','c'],
-                            ['a',2,1,4],
-                            ['f',3,'g','g'],
-                            ['f','h','i','i']],
-                           [['a',6,'*'],
-                            ['b',3,'-'],
-                            ['c',3,'='],
-                            ['f',3,'-'],
-                            ['g',2,'/'],
-                            ['h',4,'='],
-                            ['i',1,'-']])
-
-## a partial solution to puzzle1 with a cage partially filled in
-puzzle1partial2 = Puzzle(4, [[Guess('a',2),'b','b','c'],
-                             ['a',2,1,4],
-                             ['f',3,'g','g'],
-                             ['f','h','i','i']],
-                            [['a',6,'*'],
-                             ['b',3,'-'],
-                             ['c',3,'='],
-                             ['f',3,'-'],
-                             ['g',2,'/'],
-                             ['h',4,'='],
-                             ['i',1,'-']])
-
-## a partial solution to puzzle1 with a cage partially filled in
-##  but not yet verified
-puzzle1partial3 = Puzzle(4, [[Guess('a',2),'b','b','c'],
-                             [Guess('a',3),2,1,4],
-                             ['f',3,'g','g'],
-                             ['f','h','i','i']],
-                            [['a',6,'*'],
-                             ['b',3,'-'],
-                             ['c',3,'='],
-                             ['f',3,'-'],
-                             ['g',2,'/'],
-                             ['h',4,'='],
-                             ['i',1,'-']])
-
-## a partial solution to puzzle1 with a cage partially filled in
-##  but not yet verified and incorrect guess
-puzzle1partial4 = Puzzle(4, [[2,'b','b','c'],
-                             [3,2,1,4],
-                             ['f',3,'g','g'],
-                             ['f','h','i','i']],
-                            [['b',3,'-'],
-                             ['c',3,'='],
-                             ['f',3,'-'],
-                             ['g',2,'/'],
-                             ['h',4,'='],
-                             ['i',1,'-']])
-
-puzzle1partial4a = Puzzle(4, [[2,Guess('b',1),Guess('b',3),'c'],
-                              [3,2,1,4],
-                              ['f',3,'g','g'],
-                              ['f','h','i','i']],
-                             [['b',3,'-'],
-                              ['c',3,'='],
-                              ['f',3,'-'],
-                              ['g',2,'/'],
-                              ['h',4,'='],
-                              ['i',1,'-']])
-
-puzzle1partial4b = Puzzle(4, [[2,Guess('b',1),Guess('b',4),'c'],
-                              [3,2,1,4],
-                              ['f',3,'g','g'],
-                              ['f','h','i','i']],
-                             [['b',3,'-'],
-                              ['c',3,'='],
-                              ['f',3,'-'],
-                              ['g',2,'/'],
-                              ['h',4,'='],
-                              ['i',1,'-']])
-
-## The solution to puzzle 1
-puzzle1soln = Puzzle(4, [[2,1,4,3],[3,2,1,4],[4,3,2,1],[1,4,3,2]], [])
-
-
-puzzle1_first_guess = [
-  Puzzle(4, [[Guess('a', 1),'b','b','c'],
-             ['a','d','e','e'],
-             ['f','d','g','g'],
-             ['f','h','i','i']],
-            [['a',6,'*'],
-             ['b',3,'-'],
-             ['c',3,'='],
-             ['d',5,'+'],
-             ['e',3,'-'],
-             ['f',3,'-'],
-             ['g',2,'/'],
-             ['h',4,'='],
-             ['i',1,'-']]),
-  Puzzle(4, [[Guess('a', 2),'b','b','c'],
-             ['a','d','e','e'],
-             ['f','d','g','g'],
-             ['f','h','i','i']],
-            [['a',6,'*'],
-             ['b',3,'-'],
-             ['c',3,'='],
-             ['d',5,'+'],
-             ['e',3,'-'],
-             ['f',3,'-'],
-             ['g',2,'/'],
-             ['h',4,'='],
-             ['i',1,'-']]),
-  Puzzle(4, [[Guess('a', 3),'b','b','c'],
-             ['a','d','e','e'],
-             ['f','d','g','g'],
-             ['f','h','i','i']],
-            [['a', 6,'*'],
-             ['b',3,'-'],
-             ['c',3,'='],
-             ['d',5,'+'],
-             ['e',3,'-'],
-             ['f',3, '-'],
-             ['g',2,'/'],
-             ['h',4,'='],
-             ['i',1,'-']]),
-  Puzzle(4, [[Guess('a', 4),'b','b','c'],
-             ['a','d','e','e'],
-             ['f','d','g','g'],
-             ['f','h','i','i']],
-            [['a',6,'*'],
-             ['b',3,'-'],
-             ['c',3,'='],
-             ['d',5,'+'],
-             ['e',3,'-'],
-             ['f',3,'-'],
-             ['g',2,'/'],
-             ['h',4,'='],
-             ['i',1,'-']])  ]
-
-puzzle2a = Puzzle(4, [[4,2,'a','a'],
-                      ['b', Guess('c',3),'a',4],
-                      ['b', Guess('c',1),Guess('c',4),2],
-                      [1,Guess('c',4),Guess('c',2),3]],
-                     [['c',96,'*'],
-                      ['b',5,'+'],
-                      ['a',3,'*']])
-
-puzzle2b = Puzzle(4, [[  4,2,'a','a'],
-                      ['b',3,'a',  4],
-                      ['b',1,  4,  2],
-                      [1,  4,  2,  3]],
-                     [['b',5,'+'],
-                      ['a',3,'*']])
-
-puzzle2c = Puzzle(4, [[4,2,'a','a'],
-                      ['b', Guess('c',3),'a',4],
-                      ['b', Guess('c',3),Guess('c',4),2],
-                      [1,Guess('c',4),Guess('c',2),3]],
-                     [['c',96,'*'],
-                      ['b',5,'+'],
-                      ['a',3,'*']])
-
-
-## ******** END TESTING VALUES ***************
+  def __repr__(self):
+    '''
+    Returns a string representation of self.
+
+    __repr__: SearchStats -> Str
+    '''
+    return ("SearchStats(explored={0},max_depth={1},cache_size={2}," + \
+      "evictions={3},peak_memory={4})").format(self.explored,
+      self.max_depth, self.cache_size, self.evictions, self.peak_memory)
+
+
+## The testing values used in the examples below are in testing_values.py.
+## They are kept out of this module so importing it builds no fixtures.
 
 
 def fill_in_guess(puz, pos, val):
@@ -353,34 +233,361 @@ def fill_in_guess(puz, pos, val):
   return res
 
 
-def solve_kenken(orig):
+def encode_state(puz):
+  '''
+  Returns a compact key for puz, a puzzle reached while solving
+  some original puzzle. Two puzzles of the same search are equal
+  exactly when their keys are equal.
+
+  The key is the number of constraints left and the cells of the
+  board, row by row. Cages and numbers are kept as they are and a
+  Guess becomes a (symbol, number) tuple, so a cage named '1' is
+  never mistaken for the number 1. Only the number of constraints
+  is kept since the search only ever removes the first one.
+
+  encode_state: Puzzle -> Key
+
+  Examples:
+     encode_state(puzzle1soln) =>
+        (0, (2,1,4,3, 3,2,1,4, 4,3,2,1, 1,4,3,2))
+     encode_state(puzzle1_first_guess[1]) =>
+        (9, (('a',2),'b','b','c', 'a','d','e','e',
+             'f','d','g','g', 'f','h','i','i'))
+  '''
+  cells = []
+  for row in puz.board:
+    for cell in row:
+      if isinstance(cell, Guess):
+        cells.append((cell.symbol, cell.number))
+      else:
+        cells.append(cell)
+  return (len(puz.constraints), tuple(cells))
+
+
+def decode_state(key, orig):
+  '''
+  Returns the puzzle encoded by key, a state reached while
+  solving orig. Lists are accepted in place of tuples, so keys
+  read back from JSON can be decoded directly.
+
+  decode_state: (anyof Key (listof Any)) Puzzle -> Puzzle
+  Requires: key was produced by encode_state on a puzzle
+            reached while solving orig
+
+  Example:
+     decode_state(encode_state(puzzle1_first_guess[1]), puzzle1)
+        => puzzle1_first_guess[1]
+  '''
+  count, cells = key
+  board = []
+  for y in range(orig.size):
+    row = []
+    for cell in cells[y*orig.size:(y+1)*orig.size]:
+      if isinstance(cell, (list, tuple)):
+        row.append(Guess(cell[0], cell[1]))
+      else:
+        row.append(cell)
+    board.append(row)
+  first = len(orig.constraints) - count
+  return Puzzle(orig.size, board, copy.deepcopy(orig.constraints[first:]))
+
+
+def key_valid(key, orig):
+  '''
+  Returns True if key, read back from JSON, has the shape of a Key
+  of a puzzle reached while solving orig, and False otherwise.
+
+  key_valid: Any Puzzle -> Bool
+
+  Examples:
+     key_valid([9, ['a','b','b','c', 'a','d','e','e',
+                    'f','d','g','g', 'f','h','i','i']], puzzle1) => True
+     key_valid([9, ['a','b']], puzzle1) => False
+  '''
+  if not isinstance(key, list) or len(key) != 2 or \
+     type(key[0]) != int or not 0 <= key[0] <= len(orig.constraints) or \
+     not isinstance(key[1], list) or len(key[1]) != orig.size ** 2:
+    return False
+  for cell in key[1]:
+    if isinstance(cell, list):
+      if len(cell) != 2 or not isinstance(cell[0], str) or \
+         type(cell[1]) != int:
+        return False
+    elif not isinstance(cell, str) and type(cell) != int:
+      return False
+  return True
+
+
+def save_checkpoint(fname, orig, to_visit):
+  '''
+  Saves the search state of solving orig, the puzzles still
+  to_visit, to fname as gzip compressed JSON.
+
+  Every puzzle in the search is reached from exactly one parent,
+  so the puzzles still to visit are enough to resume it and the
+  visited puzzles are not saved. Each save therefore costs
+  O(len(to_visit)), which is at most the depth of the search
+  times the puzzle size, however many puzzles have been explored.
+
+  The snapshot is written to a temporary file first and then
+  moved over fname, so an interrupted save never leaves a
+  damaged checkpoint behind.
+
+  Effects: Writes to a file
+
+  save_checkpoint: Str Puzzle (listof Puzzle) -> None
+  '''
+  state = {'orig': encode_state(orig),
+           'constraints': orig.constraints,
+           'to_visit': list(map(encode_state, to_visit))}
+  import gzip, json
+  tmp = fname + '.tmp'
+  with gzip.open(tmp, 'wt', encoding='utf-8') as fout:
+    json.dump(state, fout, separators=(',', ':'))
+  os.replace(tmp, fname)
+
+
+def load_checkpoint(fname, orig):
+  '''
+  Returns the puzzles still to visit saved in fname by
+  save_checkpoint while solving orig, or False if fname does
+  not exist.
+
+  Effects: Reads from a file
+
+  load_checkpoint: Str Puzzle -> (anyof (listof Puzzle) False)
+  Raises ValueError if fname is not a checkpoint written by
+    save_checkpoint or was saved while solving a different puzzle.
+  '''
+  if not os.path.exists(fname):
+    return False
+  import gzip, json
+  try:
+    with gzip.open(fname, 'rt', encoding='utf-8') as fin:
+      state = json.load(fin)
+  except (gzip.BadGzipFile, EOFError, UnicodeDecodeError, ValueError):
+    raise ValueError(fname + ' is not a checkpoint')
+  if not isinstance(state, dict) or \
+     not isinstance(state.get('to_visit'), list) or \
+     not all(map(lambda x: key_valid(x, orig),
+                 [state.get('orig')] + state['to_visit'])):
+    raise ValueError(fname + ' is not a checkpoint')
+  if decode_state(state['orig'], orig) != orig or \
+     state.get('constraints') != orig.constraints:
+    raise ValueError(fname + ' is a checkpoint of a different puzzle')
+  return list(map(lambda x: decode_state(x, orig), state['to_visit']))
+
+
+def solve_kenken(orig, checkpoint=None, checkpoint_every=1000):
   '''
   Finds the solution to a KenKen puzzle, orig, or returns False
   if there is no solution.
 
-  solve-kenken: Puzzle -> (anyof Puzzle False)
-  '''
+  If checkpoint is a file name, the search state is saved there
+  after every checkpoint_every puzzles explored, and a search that
+  finds a checkpoint of orig there resumes from it instead of
+  starting over. The checkpoint is removed once the search ends.
 
-  to_visit = []
-  visited = []
-  to_visit.append(orig)
-  while to_visit != []:
-    
-    print(orig)
+  Effects: Reads from and writes to checkpoint if it is not None
 
+  solve-kenken: Puzzle (anyof Str None) Nat -> (anyof Puzzle False)
+  Raises ValueError if checkpoint_every < 1.
+  '''
+  if checkpoint_every < 1:
+    raise ValueError('checkpoint_every must be at least 1')
+
+  to_visit = [orig]
+  visited = set()
+  if checkpoint != None:
+    saved = load_checkpoint(checkpoint, orig)
+    if saved != False:
+      to_visit = saved
+  explored = 0
+  res = False
+  while to_visit != []:
+    key = encode_state(to_visit[0])
     if find_blank(to_visit[0]) == False:
-      return to_visit[0]
-    elif to_visit[0] in visited:
+      res = to_visit[0]
+      break
+    elif key in visited:
       to_visit.pop(0)
     else:
       nbrs = neighbours(to_visit[0])
-      new = list(filter(lambda x: x not in visited, nbrs))
-      new_to_visit = new + to_visit[1:]
-      new_visited = [to_visit[0]] + visited
-      to_visit = new_to_visit
-      visited = new_visited
+      new = list(filter(lambda x: encode_state(x) not in visited, nbrs))
+      visited.add(key)
+      to_visit = new + to_visit[1:]
+      explored += 1
+      if checkpoint != None and explored % checkpoint_every == 0:
+        save_checkpoint(checkpoint, orig, to_visit)
+
+  if checkpoint != None and os.path.exists(checkpoint):
+    os.remove(checkpoint)
+  return res
 
-  return False
+
+def solve_kenken_bounded(orig, cache_limit=0, track_memory=False):
+  '''
+  Finds the solution to a KenKen puzzle, orig, like solve_kenken
+  but keeping only the current search path in memory: for each
+  puzzle on the path its key and a lazy iter_neighbours generator,
+  which holds one copy of that puzzle and its list of at most
+  orig.size candidate values. Memory for the path is therefore
+  O(depth * orig.size ** 2) no matter how many puzzles are
+  explored.
+
+  Puzzles found to lead nowhere can be remembered in a dead-end
+  cache of at most cache_limit keys, evicting the least recently
+  used first. Every puzzle in the search has exactly one parent,
+  so with neighbours as it is no puzzle is reached twice and the
+  cache never hits: it only costs memory, so it is off by default.
+  It is kept for searches that can reach a puzzle twice. There is
+  no iterative deepening either, since every solution lies at the
+  same depth (one level per cell filled and per cage applied), so
+  a depth limit could only cut the search short.
+
+  Returns the solution (or False if there is none) and the
+  SearchStats of the search. If track_memory is True the peak
+  memory of the search is measured with tracemalloc, which makes
+  it several times slower.
+
+  solve_kenken_bounded: Puzzle Nat Bool ->
+                        (list (anyof Puzzle False) SearchStats)
+  Requires: cache_limit >= 0
+
+  Example:
+     solve_kenken_bounded(puzzle1)[0] => puzzle1soln
+  '''
+  from collections import OrderedDict  #evicts the oldest dead ends first
+  stats = SearchStats()
+  if track_memory:
+    import tracemalloc
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+      tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+
+  dead_ends = OrderedDict()
+  res = False
+  if find_blank(orig) == False:
+    res = orig
+    stack = []
+  else:
+    ## Each entry is a puzzle on the current path, by key (None when
+    ## the dead-end cache is off), and a generator of its neighbours
+    ## not yet tried.
+    key = None
+    if cache_limit > 0:
+      key = encode_state(orig)
+    stack = [[key, iter_neighbours(orig)]]
+    stats.explored = 1
+    stats.max_depth = 1
+
+  while stack != []:
+    nxt = next(stack[-1][1], None)
+    if nxt is None:
+      key = stack.pop()[0]
+      if cache_limit > 0:
+        dead_ends[key] = None
+        if len(dead_ends) > cache_limit:
+          dead_ends.popitem(last=False)
+          stats.evictions += 1
+        stats.cache_size = max(stats.cache_size, len(dead_ends))
+    elif find_blank(nxt) == False:
+      res = nxt
+      break
+    else:
+      key = None
+      if cache_limit > 0:
+        key = encode_state(nxt)
+      if key in dead_ends:
+        dead_ends.move_to_end(key)
+      else:
+        stack.append([key, iter_neighbours(nxt)])
+        stats.explored += 1
+        stats.max_depth = max(stats.max_depth, len(stack))
+
+  if track_memory:
+    stats.peak_memory = tracemalloc.get_traced_memory()[1] - base
+    if not tracing:
+      tracemalloc.stop()
+  return [res, stats]
+
+
+def parse_puzzle(text, name='<puzzle>'):
+  '''
+  Returns the Puzzle represented by text, in the format read by
+  read_puzzle. Blank lines are ignored and cells may be separated
+  by any amount of whitespace. A cage may be named by any single
+  character that is not whitespace, digits and punctuation such
+  as '/', ':' and '|' included: encode_state keeps such cages apart
+  from numbers, so checkpoints and resumed searches handle them.
+
+  parse_puzzle: Str Str -> Puzzle
+  Raises ValueError naming name and the offending line if text
+    does not represent a puzzle as described in the project
+    specification.
+
+  Example:
+     parse_puzzle("2\na a\nb c\na 3 +\nb 2 =\nc 1 =\n") =>
+        Puzzle(2, [['a','a'],['b','c']],
+                  [['a',3,'+'],['b',2,'='],['c',1,'=']])
+  '''
+  lines = []
+  for num, line in enumerate(text.splitlines(), 1):
+    words = line.split()
+    if words != []:
+      lines.append([num, words])
+
+  def error(num, msg):
+    return ValueError('{0}:{1}: {2}'.format(name, num, msg))
+
+  if lines == []:
+    raise error(1, 'missing puzzle size')
+  num, words = lines[0]
+  if len(words) != 1 or not words[0].isdecimal() or int(words[0]) == 0:
+    raise error(num, 'expected a positive puzzle size')
+  size = int(words[0])
+  if len(lines) < size + 1:
+    raise error(lines[-1][0], 'expected {0} board rows'.format(size))
+
+  board = []
+  cages = {}
+  for num, words in lines[1:size+1]:
+    if len(words) != size:
+      raise error(num, 'expected {0} cells in board row'.format(size))
+    for cell in words:
+      if len(cell) != 1:
+        raise error(num, 'cage ' + repr(cell) + ' is not one character')
+      cages[cell] = cages.get(cell, 0) + 1
+    board.append(words)
+
+  constraints = []
+  seen = set()
+  for num, words in lines[size+1:]:
+    if len(words) != 3:
+      raise error(num, 'expected a constraint: cage target operator')
+    symbol, target, op = words
+    if symbol not in cages:
+      raise error(num, 'cage ' + repr(symbol) + ' is not on the board')
+    if symbol in seen:
+      raise error(num, 'cage ' + repr(symbol) + ' has two constraints')
+    if not target.isdecimal() or int(target) == 0:
+      raise error(num, 'expected a positive target')
+    if op not in ['+', '-', '*', '/', '=']:
+      raise error(num, 'unknown operator ' + repr(op))
+    if (op == '=' and cages[symbol] != 1) or \
+       (op in ['-', '/'] and cages[symbol] != 2):
+      raise error(num, 'cage {0} has {1} cells but {2} needs {3}'.format(
+        repr(symbol), cages[symbol], repr(op), 1 if op == '=' else 2))
+    seen.add(symbol)
+    constraints.append([symbol, int(target), op])
+
+  if seen != set(cages):
+    missing = ' '.join(sorted(set(cages) - seen))
+    raise error(lines[-1][0], 'no constraint for cages ' + missing)
+
+  return Puzzle(size, board, constraints)
 
 
 def read_puzzle(fname):
@@ -391,8 +598,9 @@ def read_puzzle(fname):
   Effects: Reads from a file
 
   read_puzzle: Str -> Puzzle
-  Requires: a file named fname exists and represents a puzzle as described
-            in the project specification.
+  Requires: a file named fname exists
+  Raises ValueError if fname does not represent a puzzle as described
+    in the project specification.
 
 
   Example:
@@ -426,20 +634,9 @@ def read_puzzle(fname):
                      ['h',4,'='],
                      ['i',1,'-']])
   '''
-  fin = open(fname, 'r')
-  puzzle = []
-  for line in fin.readlines():
-    puzzle.append(line.strip())
-  fin.close()
-
-  size = int(puzzle[0])
-  board = list(map(lambda x: (x.split(' ')), puzzle[1:size+1]))
-  constraints = list(map(lambda x: (x.split(' ')), puzzle[size+1:]))
-
-  for x in constraints:
-    x[1] = int(x[1])
-
-  return Puzzle(size, board, constraints)
+  with open(fname, 'r') as fin:
+    text = fin.read()
+  return parse_puzzle(text, fname)
 
 #part b)
 
@@ -463,12 +660,89 @@ def print_sol(puz, fname):
      1  4  3  2
 
   '''
-  fout = open(fname, 'w')
-  for x in puz.board:
-    list_string = '  '.join(map(str, x))
-    fout.write(list_string)
-    fout.write('\n')
-  fout.close
+  with open(fname, 'w') as fout:
+    fout.write(format_sol(puz))
+
+
+def format_sol(puz):
+  '''
+  Returns the solved Puzzle puz as the text written by print_sol.
+
+  format_sol: Puzzle -> Str
+  Requires: Puzzle is solved.
+
+  Example:
+     format_sol(puzzle1soln) =>
+        '2  1  4  3\n3  2  1  4\n4  3  2  1\n1  4  3  2\n'
+  '''
+  return ''.join('  '.join(str(x) for x in row) + '\n' for row in puz.board)
+
+
+def append_sols(results, fname):
+  '''
+  Appends one record for each [name, result] in results to fname
+  file, opening fname only once. A record is a line '# name', then
+  the solution in the format written by print_sol, the line
+  'no solution' if result is False or the line 'error: result' if
+  result is a Str, then a blank line. results may be any iterable,
+  such as a generator, and each record is written as soon as it is
+  produced, so the records already written are kept if producing a
+  later one fails.
+
+  Effects: Writes to a file
+
+  append_sols: (iterableof (list Str (anyof Puzzle False Str))) Str
+               -> None
+  Requires: every Puzzle in results is solved.
+
+  Example:
+     append_sols([['inp1.txt', puzzle1soln], ['inp2.txt', False]],
+                 "results.txt") => None
+     and "results.txt" ends with:
+     # inp1.txt
+     2  1  4  3
+     3  2  1  4
+     4  3  2  1
+     1  4  3  2
+
+     # inp2.txt
+     no solution
+
+  '''
+  with open(fname, 'a') as fout:
+    for name, res in results:
+      if isinstance(res, str):
+        fout.write('# ' + name + '\nerror: ' + res + '\n\n')
+      elif res == False:
+        fout.write('# ' + name + '\nno solution\n\n')
+      else:
+        fout.write('# ' + name + '\n' + format_sol(res) + '\n')
+
+
+def read_sol(fname, size):
+  '''
+  Reads a solution written by print_sol from fname file and
+  returns it as a board of numbers.
+
+  Effects: Reads from a file
+
+  read_sol: Str Nat -> (listof (listof Nat))
+  Raises ValueError if fname does not contain size rows of
+    size numbers.
+
+  Example:
+     Assume "out1.txt" was written by print_sol(puzzle1soln, "out1.txt")
+     then read_sol("out1.txt", 4) => puzzle1soln.board
+  '''
+  with open(fname, 'r') as fin:
+    rows = [line.split() for line in fin.read().splitlines()
+            if line.split() != []]
+  if len(rows) != size or any(len(row) != size for row in rows):
+    raise ValueError('{0}: expected {1} rows of {1} numbers'.format(
+      fname, size))
+  if not all(cell.isdecimal() for row in rows for cell in row):
+    raise ValueError(fname + ': solution cells must be numbers')
+  return [[int(cell) for cell in row] for row in rows]
 
 '''  
 result1.txt should contain:
@@ -718,16 +992,28 @@ def neighbours(puz):
      neighbours(puzzle1soln) => []
      neighbours(puzzle2a) => [puzzle2b]
   '''
+  return list(iter_neighbours(puz))
+
+
+def iter_neighbours(puz):
+  '''
+  Yields the next puzzles after puz one at a time, in the order
+  neighbours returns them, building each only when it is asked for.
+
+  iter_neighbours: Puzzle -> (generatorof Puzzle)
+
+  Example:
+     list(iter_neighbours(puzzle2a)) => [puzzle2b]
+  '''
   ## a copy of puz is assigned to tmp without any
   ## aliasing to avoid mutation of puz.
   tmp = Puzzle(puz.size, copy.deepcopy(puz.board),
         copy.deepcopy(puz.constraints))
 
-  list_puzzles = []
   y = -1
 
   if tmp.constraints == []:
-    return []
+    return
 
   for i in tmp.board:
     y += 1
@@ -737,11 +1023,204 @@ def neighbours(puz):
       if j == tmp.constraints[0][0]:
         list_vals = available_vals(tmp, Posn(x, y))
         for g in list_vals:
-          list_puzzles = list_puzzles + [fill_in_guess(tmp, Posn(x, y), g)]
-        return list_puzzles
+          yield fill_in_guess(tmp, Posn(x, y), g)
+        return
 
   else:
     if guess_valid(tmp):
-      return [apply_guess(tmp)]
+      yield apply_guess(tmp)
+
+
+def sol_valid(puz, brd):
+  '''
+  Returns True if brd, a board of numbers, solves puz and
+  False otherwise.
+
+  sol_valid: Puzzle (listof (listof Nat)) -> Bool
+  Requires: len(brd) == puz.size and every row has puz.size numbers
+
+  Examples:
+     sol_valid(puzzle1, puzzle1soln.board) => True
+     sol_valid(puzzle1, [[1,2,3,4],[2,3,4,1],[3,4,1,2],[4,1,2,3]]) => False
+  '''
+  values = list(range(1, puz.size + 1))
+  for i in range(puz.size):
+    if sorted(brd[i]) != values or \
+       sorted(map(lambda row: row[i], brd)) != values:
+      return False
+
+  for c in puz.constraints:
+    ## Each cage is checked with guess_valid by turning its cells into
+    ## Guesses and making its constraint the first (and only) one.
+    cage = copy.deepcopy(puz.board)
+    for y in range(puz.size):
+      for x in range(puz.size):
+        if cage[y][x] == c[0]:
+          cage[y][x] = Guess(c[0], brd[y][x])
+    if not guess_valid(Puzzle(puz.size, cage, [c])):
+      return False
+  return True
+
+
+def positive_int(s):
+  '''
+  Returns the integer written in s, for command line options
+  that must be at least 1.
+
+  positive_int: Str -> Nat
+  Raises ValueError if s is not an integer or is less than 1.
+
+  Examples:
+     positive_int('3') => 3
+     positive_int('0') raises ValueError
+  '''
+  n = int(s)
+  if n < 1:
+    raise ValueError(s + ' is less than 1')
+  return n
+
+
+def nonnegative_int(s):
+  '''
+  Returns the integer written in s, for command line options
+  that must be at least 0.
+
+  nonnegative_int: Str -> Nat
+  Raises ValueError if s is not an integer or is less than 0.
+
+  Examples:
+     nonnegative_int('0') => 0
+     nonnegative_int('-5') raises ValueError
+  '''
+  n = int(s)
+  if n < 0:
+    raise ValueError(s + ' is less than 0')
+  return n
+
+
+def main(argv=None):
+  '''
+  Runs the command line interface with the arguments argv
+  (sys.argv[1:] if argv is None) and returns the exit status:
+  0 on success, 1 if a puzzle has no solution or a solution
+  is invalid.
+
+    solve PUZZLE [-o OUT] [--checkpoint FILE] [--checkpoint-every N]
+          [--bounded [--cache-limit N] [--memory]]
+    batch PUZZLE... -o OUT   (one record per PUZZLE, see append_sols)
+    verify PUZZLE SOLUTION
+    bench PUZZLE... [-n REPEAT]
+
+  Effects: Reads from and writes to files and the console
+
+  main: (anyof (listof Str) None) -> Nat
+  '''
+  import argparse
+  parser = argparse.ArgumentParser(prog='main.py',
+                                   description='Solves KenKen puzzles.')
+  sub = parser.add_subparsers(dest='command', required=True)
+
+  p = sub.add_parser('solve', help='solve one puzzle')
+  p.add_argument('puzzle')
+  p.add_argument('-o', '--output',
+                 help='file to write the solution to (default: stdout)')
+  p.add_argument('--checkpoint',
+                 help='file to save the search to and resume it from')
+  p.add_argument('--checkpoint-every', type=positive_int, default=1000,
+                 metavar='N', help='save after every N puzzles explored')
+  p.add_argument('--bounded', action='store_true',
+                 help='keep only the search path and a capped dead-end cache')
+  p.add_argument('--cache-limit', type=nonnegative_int, metavar='N',
+                 help='most dead ends cached by --bounded (default: 0)')
+  p.add_argument('--memory', action='store_true',
+                 help='report the peak memory of --bounded on stderr')
+
+  p = sub.add_parser('batch', help='solve puzzles into one output file')
+  p.add_argument('puzzles', nargs='+')
+  p.add_argument('-o', '--output', required=True,
+                 help='file to append a record for each puzzle to')
+
+  p = sub.add_parser('verify', help='check a solution file')
+  p.add_argument('puzzle')
+  p.add_argument('solution')
+
+  p = sub.add_parser('bench', help='time solving puzzles')
+  p.add_argument('puzzles', nargs='+')
+  p.add_argument('-n', '--repeat', type=positive_int, default=5)
+
+  args = parser.parse_args(argv)
+
+  try:
+    if args.command == 'solve':
+      if args.bounded and args.checkpoint != None:
+        parser.error('--bounded cannot be used with --checkpoint')
+      if not args.bounded and (args.cache_limit != None or args.memory):
+        parser.error('--cache-limit and --memory need --bounded')
+      if args.bounded:
+        if args.cache_limit == None:
+          args.cache_limit = 0
+        res, stats = solve_kenken_bounded(read_puzzle(args.puzzle),
+                                          args.cache_limit, args.memory)
+        print(stats, file=sys.stderr)
+      else:
+        res = solve_kenken(read_puzzle(args.puzzle), args.checkpoint,
+                           args.checkpoint_every)
+      if res == False:
+        print(args.puzzle + ': no solution', file=sys.stderr)
+        return 1
+      if args.output == None:
+        sys.stdout.write(format_sol(res))
+      else:
+        print_sol(res, args.output)
+      return 0
+
+    elif args.command == 'batch':
+      ## Records are solved one at a time while append_sols writes
+      ## them, and a puzzle that cannot be read gets an error record.
+      status = [0]
+
+      def results():
+        for fname in args.puzzles:
+          try:
+            res = solve_kenken(read_puzzle(fname))
+          except (OSError, ValueError) as e:
+            res = str(e)
+          if isinstance(res, str):
+            print('main.py: ' + res, file=sys.stderr)
+            status[0] = 1
+          elif res == False:
+            print(fname + ': no solution', file=sys.stderr)
+            status[0] = 1
+          yield [fname, res]
+
+      append_sols(results(), args.output)
+      return status[0]
+
+    elif args.command == 'verify':
+      puz = read_puzzle(args.puzzle)
+      if sol_valid(puz, read_sol(args.solution, puz.size)):
+        print(args.solution + ': ok')
+        return 0
+      print(args.solution + ': invalid', file=sys.stderr)
+      return 1
+
     else:
-      return []
+      import time
+      for fname in args.puzzles:
+        puz = read_puzzle(fname)
+        times = []
+        for i in range(args.repeat):
+          start = time.perf_counter()
+          solve_kenken(puz)
+          times.append(time.perf_counter() - start)
+        print('{0}: best {1:.6f}s  mean {2:.6f}s  ({3} runs)'.format(
+          fname, min(times), sum(times) / len(times), len(times)))
+      return 0
+
+  except (OSError, ValueError) as e:
+    print('main.py: ' + str(e), file=sys.stderr)
+    return 1
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,176 @@
+from main import Puzzle, Guess
+
+## ******** TESTING VALUES ***************
+## Note: These are also used in the examples in main.py.
+
+puzzle1 = Puzzle(4, [['a','b','b','c'],
+                     ['a','d','e','e'],
+                     ['f','d','g','g'],
+                     ['f','h','i','i']],
+                    [['a',6,'*'],
+                     ['b',3,'-'],
+                     ['c',3,'='],
+                     ['d',5,'+'],
+                     ['e',3,'-'],
+                     ['f',3,'-'],
+                     ['g',2,'/'],
+                     ['h',4,'='],
+                     ['i',1,'-']])
+
+puzzle1partial = Puzzle(4, [['a','b','b','c'],
+                            ['a',2,1,4],
+                            ['f',3,'g','g'],
+                            ['f','h','i','i']],
+                           [['a',6,'*'],
+                            ['b',3,'-'],
+                            ['c',3,'='],
+                            ['f',3,'-'],
+                            ['g',2,'/'],
+                            ['h',4,'='],
+                            ['i',1,'-']])
+
+## a partial solution to puzzle1 with a cage partially filled in
+puzzle1partial2 = Puzzle(4, [[Guess('a',2),'b','b','c'],
+                             ['a',2,1,4],
+                             ['f',3,'g','g'],
+                             ['f','h','i','i']],
+                            [['a',6,'*'],
+                             ['b',3,'-'],
+                             ['c',3,'='],
+                             ['f',3,'-'],
+                             ['g',2,'/'],
+                             ['h',4,'='],
+                             ['i',1,'-']])
+
+## a partial solution to puzzle1 with a cage partially filled in
+##  but not yet verified
+puzzle1partial3 = Puzzle(4, [[Guess('a',2),'b','b','c'],
+                             [Guess('a',3),2,1,4],
+                             ['f',3,'g','g'],
+                             ['f','h','i','i']],
+                            [['a',6,'*'],
+                             ['b',3,'-'],
+                             ['c',3,'='],
+                             ['f',3,'-'],
+                             ['g',2,'/'],
+                             ['h',4,'='],
+                             ['i',1,'-']])
+
+## a partial solution to puzzle1 with a cage partially filled in
+##  but not yet verified and incorrect guess
+puzzle1partial4 = Puzzle(4, [[2,'b','b','c'],
+                             [3,2,1,4],
+                             ['f',3,'g','g'],
+                             ['f','h','i','i']],
+                            [['b',3,'-'],
+                             ['c',3,'='],
+                             ['f',3,'-'],
+                             ['g',2,'/'],
+                             ['h',4,'='],
+                             ['i',1,'-']])
+
+puzzle1partial4a = Puzzle(4, [[2,Guess('b',1),Guess('b',3),'c'],
+                              [3,2,1,4],
+                              ['f',3,'g','g'],
+                              ['f','h','i','i']],
+                             [['b',3,'-'],
+                              ['c',3,'='],
+                              ['f',3,'-'],
+                              ['g',2,'/'],
+                              ['h',4,'='],
+                              ['i',1,'-']])
+
+puzzle1partial4b = Puzzle(4, [[2,Guess('b',1),Guess('b',4),'c'],
+                              [3,2,1,4],
+                              ['f',3,'g','g'],
+                              ['f','h','i','i']],
+                             [['b',3,'-'],
+                              ['c',3,'='],
+                              ['f',3,'-'],
+                              ['g',2,'/'],
+                              ['h',4,'='],
+                              ['i',1,'-']])
+
+## The solution to puzzle 1
+puzzle1soln = Puzzle(4, [[2,1,4,3],[3,2,1,4],[4,3,2,1],[1,4,3,2]], [])
+
+
+puzzle1_first_guess = [
+  Puzzle(4, [[Guess('a', 1),'b','b','c'],
+             ['a','d','e','e'],
+             ['f','d','g','g'],
+             ['f','h','i','i']],
+            [['a',6,'*'],
+             ['b',3,'-'],
+             ['c',3,'='],
+             ['d',5,'+'],
+             ['e',3,'-'],
+             ['f',3,'-'],
+             ['g',2,'/'],
+             ['h',4,'='],
+             ['i',1,'-']]),
+  Puzzle(4, [[Guess('a', 2),'b','b','c'],
+             ['a','d','e','e'],
+             ['f','d','g','g'],
+             ['f','h','i','i']],
+            [['a',6,'*'],
+             ['b',3,'-'],
+             ['c',3,'='],
+             ['d',5,'+'],
+             ['e',3,'-'],
+             ['f',3,'-'],
+             ['g',2,'/'],
+             ['h',4,'='],
+             ['i',1,'-']]),
+  Puzzle(4, [[Guess('a', 3),'b','b','c'],
+             ['a','d','e','e'],
+             ['f','d','g','g'],
+             ['f','h','i','i']],
+            [['a', 6,'*'],
+             ['b',3,'-'],
+             ['c',3,'='],
+             ['d',5,'+'],
+             ['e',3,'-'],
+             ['f',3, '-'],
+             ['g',2,'/'],
+             ['h',4,'='],
+             ['i',1,'-']]),
+  Puzzle(4, [[Guess('a', 4),'b','b','c'],
+             ['a','d','e','e'],
+             ['f','d','g','g'],
+             ['f','h','i','i']],
+            [['a',6,'*'],
+             ['b',3,'-'],
+             ['c',3,'='],
+             ['d',5,'+'],
+             ['e',3,'-'],
+             ['f',3,'-'],
+             ['g',2,'/'],
+             ['h',4,'='],
+             ['i',1,'-']])  ]
+
+puzzle2a = Puzzle(4, [[4,2,'a','a'],
+                      ['b', Guess('c',3),'a',4],
+                      ['b', Guess('c',1),Guess('c',4),2],
+                      [1,Guess('c',4),Guess('c',2),3]],
+                     [['c',96,'*'],
+                      ['b',5,'+'],
+                      ['a',3,'*']])
+
+puzzle2b = Puzzle(4, [[  4,2,'a','a'],
+                      ['b',3,'a',  4],
+                      ['b',1,  4,  2],
+                      [1,  4,  2,  3]],
+                     [['b',5,'+'],
+                      ['a',3,'*']])
+
+puzzle2c = Puzzle(4, [[4,2,'a','a'],
+                      ['b', Guess('c',3),'a',4],
+                      ['b', Guess('c',3),Guess('c',4),2],
+                      [1,Guess('c',4),Guess('c',2),3]],
+                     [['c',96,'*'],
+                      ['b',5,'+'],
+                      ['a',3,'*']])
+
+
+## ******** END TESTING VALUES ***************